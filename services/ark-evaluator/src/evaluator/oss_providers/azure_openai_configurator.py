@@ -1,97 +1,44 @@
 """
 Azure OpenAI Configurator for managing Azure-specific configurations.
-Handles environment variables, embeddings, and model configurations for Azure OpenAI.
+Handles credentials, embeddings, and model configurations for Azure OpenAI.
 """
 
-import os
+import asyncio
 import logging
+import threading
 from typing import Dict, Any, Optional, Tuple, List
-from contextlib import contextmanager
+
+from .llm_provider import config_cache_key
 
 logger = logging.getLogger(__name__)
 
+# RAGAS-wrapped embeddings clients keyed by endpoint, deployment, model, API version
+# and hashed API key, shared across evaluations so HTTP connection pools are reused
+_EMBEDDINGS_CACHE_MAX_SIZE = 16
+_embeddings_cache: Dict[tuple, Any] = {}
+_embeddings_cache_lock = threading.Lock()
+
 
 class AzureOpenAIConfigurator:
     """
-    Manages Azure OpenAI configurations including environment variables,
-    embeddings, and model settings.
+    Manages Azure OpenAI configurations including embeddings and model settings.
+    Credentials are always passed to clients explicitly, never through os.environ.
     """
     
-    # Azure environment variable mappings
-    ENV_MAPPINGS = {
-        'langfuse.azure_api_key': 'AZURE_OPENAI_API_KEY',
-        'langfuse.azure_endpoint': 'AZURE_OPENAI_ENDPOINT', 
-        'langfuse.model_version': 'OPENAI_API_VERSION'
-    }
-    
     # Default embedding configurations
     DEFAULT_EMBEDDING_DEPLOYMENT = 'text-embedding-ada-002'
     DEFAULT_EMBEDDING_MODEL = 'text-embedding-ada-002'
     
-    @staticmethod
-    def extract_azure_env_vars(params: Dict[str, Any]) -> Dict[str, str]:
-        """
-        Extract Azure OpenAI environment variables from parameters.
-        
-        Args:
-            params: Request parameters containing Azure configuration
-            
-        Returns:
-            Dictionary of environment variable names and values
-        """
-        env_vars = {}
-        
-        for param_key, env_key in AzureOpenAIConfigurator.ENV_MAPPINGS.items():
-            if param_key in params:
-                env_vars[env_key] = params[param_key]
-                logger.debug(f"Extracted {env_key} from {param_key}")
-        
-        if env_vars:
-            logger.info(f"Extracted Azure environment variables: {list(env_vars.keys())}")
-        
-        return env_vars
-    
-    @staticmethod
-    @contextmanager
-    def azure_env_context(params: Dict[str, Any]):
-        """
-        Context manager for temporarily setting Azure OpenAI environment variables.
-        
-        Args:
-            params: Request parameters containing Azure configuration
-            
-        Yields:
-            List of environment variables that were set
-        """
-        env_vars = AzureOpenAIConfigurator.extract_azure_env_vars(params)
-        env_vars_set = []
-        
-        try:
-            # Set environment variables
-            for key, value in env_vars.items():
-                os.environ[key] = value
-                env_vars_set.append(key)
-            
-            if env_vars_set:
-                logger.info(f"Set Azure environment variables: {env_vars_set}")
-            
-            yield env_vars_set
-            
-        finally:
-            # Clean up environment variables
-            for var in env_vars_set:
-                os.environ.pop(var, None)
-            
-            if env_vars_set:
-                logger.info(f"Cleaned up Azure environment variables: {env_vars_set}")
-    
     @staticmethod
     def create_azure_embeddings(
         llm_config: Dict[str, Any],
         params: Dict[str, Any]
     ) -> Optional[Any]:
         """
-        Create Azure OpenAI embeddings with proper configuration.
+        Get Azure OpenAI embeddings with proper configuration.
+        
+        Clients are cached per embedding configuration and reused across
+        evaluations. Connectivity is checked by test_azure_connectivity.
         
         Args:
             llm_config: LLM configuration dictionary
@@ -101,9 +48,6 @@ class AzureOpenAIConfigurator:
             Configured Azure embeddings wrapped for RAGAS, or None if creation fails
         """
         try:
-            from langchain_openai import AzureOpenAIEmbeddings
-            from ragas.embeddings import LangchainEmbeddingsWrapper
-            
             # Get embedding deployment - fallback to default if not specified
             embedding_deployment = params.get(
                 'langfuse.azure_embedding_deployment',
@@ -114,6 +58,24 @@ class AzureOpenAIConfigurator:
                 AzureOpenAIConfigurator.DEFAULT_EMBEDDING_MODEL
             )
             
+            embedding_config = {
+                'api_base': llm_config['api_base'],
+                'api_key': llm_config['api_key'],
+                'api_version': llm_config['api_version'],
+                'deployment': embedding_deployment,
+                'model': embedding_model
+            }
+            cache_key = config_cache_key(embedding_config)
+            
+            with _embeddings_cache_lock:
+                embeddings = _embeddings_cache.get(cache_key)
+            if embeddings is not None:
+                logger.debug(f"Reusing cached Azure embeddings for deployment {embedding_deployment}")
+                return embeddings
+            
+            from langchain_openai import AzureOpenAIEmbeddings
+            from ragas.embeddings import LangchainEmbeddingsWrapper
+            
             # Log deployment information for debugging
             logger.info(f"Creating Azure embeddings:")
             logger.info(f"  LLM deployment: {llm_config.get('deployment_name', 'N/A')}")
@@ -129,18 +91,15 @@ class AzureOpenAIConfigurator:
                 api_key=llm_config['api_key']
             )
             
-            # Test embeddings connectivity
-            try:
-                test_embedding = azure_embeddings.embed_query("test")
-                logger.info(f"✅ Embedding connectivity test successful, vector length: {len(test_embedding)}")
-            except Exception as embed_test_e:
-                logger.warning(f"⚠️ Embedding connectivity test failed: {embed_test_e}")
-                # Still proceed as RAGAS might work differently
-            
             # Wrap for RAGAS
             embeddings = LangchainEmbeddingsWrapper(azure_embeddings)
             logger.info("Successfully created Azure embeddings for RAGAS")
             
+            with _embeddings_cache_lock:
+                if len(_embeddings_cache) >= _EMBEDDINGS_CACHE_MAX_SIZE:
+                    _embeddings_cache.pop(next(iter(_embeddings_cache)))
+                _embeddings_cache[cache_key] = embeddings
+            
             return embeddings
             
         except ImportError as e:
@@ -194,6 +153,9 @@ class AzureOpenAIConfigurator:
         """
         Test connectivity for Azure LLM and embeddings.
         
+        Both probes run concurrently; the synchronous embeddings probe runs in
+        a worker thread so it doesn't block the event loop.
+        
         Args:
             langchain_llm: The LangChain LLM instance
             embeddings: Optional embeddings instance
@@ -201,33 +163,37 @@ class AzureOpenAIConfigurator:
         Returns:
             Tuple of (llm_success, embeddings_success)
         """
-        llm_success = False
-        embeddings_success = False
-        
-        # Test LLM connectivity
-        try:
-            test_response = await langchain_llm.agenerate([["Test connectivity"]])
-            logger.info(f"LLM connectivity test successful: {len(test_response.generations[0])} responses")
-            llm_success = True
-        except Exception as test_e:
-            logger.warning(f"LLM connectivity test failed: {test_e}")
-        
-        # Test embeddings connectivity if provided
-        if embeddings:
+        async def test_llm() -> bool:
+            try:
+                test_response = await langchain_llm.agenerate([["Test connectivity"]])
+                logger.info(f"LLM connectivity test successful: {len(test_response.generations[0])} responses")
+                return True
+            except Exception as test_e:
+                logger.warning(f"LLM connectivity test failed: {test_e}")
+                return False
+        
+        async def test_embeddings() -> bool:
+            if not embeddings:
+                return False
+            
+            # Extract the underlying embeddings object
+            if hasattr(embeddings, 'embeddings'):
+                underlying_embeddings = embeddings.embeddings
+            else:
+                underlying_embeddings = embeddings
+            
+            if not hasattr(underlying_embeddings, 'embed_query'):
+                return False
+            
             try:
-                # Extract the underlying embeddings object
-                if hasattr(embeddings, 'embeddings'):
-                    underlying_embeddings = embeddings.embeddings
-                else:
-                    underlying_embeddings = embeddings
-                
-                if hasattr(underlying_embeddings, 'embed_query'):
-                    test_embedding = underlying_embeddings.embed_query("test")
-                    logger.info(f"Embeddings connectivity test successful, vector length: {len(test_embedding)}")
-                    embeddings_success = True
+                test_embedding = await asyncio.to_thread(underlying_embeddings.embed_query, "test")
+                logger.info(f"Embeddings connectivity test successful, vector length: {len(test_embedding)}")
+                return True
             except Exception as embed_e:
                 logger.warning(f"Embeddings connectivity test failed: {embed_e}")
+                return False
         
+        llm_success, embeddings_success = await asyncio.gather(test_llm(), test_embeddings())
         return llm_success, embeddings_success
     
     @staticmethod
@@ -3,12 +3,31 @@ LLM Provider configuration and setup for multiple LLM providers.
 Supports Azure OpenAI, OpenAI, Anthropic Claude, Google Gemini, Ollama.
 """
 
+import hashlib
 import logging
 import os
+import threading
 from typing import Dict, Tuple, Any
 
 logger = logging.getLogger(__name__)
 
+# LangChain LLM clients keyed by provider type and config_cache_key, shared across
+# evaluations so HTTP connection pools are reused
+_INSTANCE_CACHE_MAX_SIZE = 16
+_instance_cache: Dict[tuple, Any] = {}
+_instance_cache_lock = threading.Lock()
+
+
+def config_cache_key(config: Dict[str, Any]) -> tuple:
+    """
+    Build a hashable cache key from a provider config.
+    API keys are hashed so raw secrets are not kept in cache keys.
+    """
+    return tuple(sorted(
+        (key, hashlib.sha256(str(value).encode()).hexdigest() if key == 'api_key' else value)
+        for key, value in config.items()
+    ))
+
 
 class LLMProvider:
     """
@@ -106,59 +125,101 @@ class LLMProvider:
         return config
     
     def create_instance(self, provider_type: str, llm_config: dict):
+        """
+        Get LLM instance for provider type and configuration, reusing a cached client when available.
+        """
+        cache_key = (provider_type, config_cache_key(llm_config))
+        
+        with _instance_cache_lock:
+            instance = _instance_cache.get(cache_key)
+        if instance is not None:
+            return instance
+        
+        instance = self._create_instance(provider_type, llm_config)
+        
+        with _instance_cache_lock:
+            if len(_instance_cache) >= _INSTANCE_CACHE_MAX_SIZE:
+                _instance_cache.pop(next(iter(_instance_cache)))
+            _instance_cache[cache_key] = instance
+        
+        return instance
+    
+    def _create_instance(self, provider_type: str, llm_config: dict):
         """
         Create LLM instance based on provider type and configuration.
         """
+        builder = _INSTANCE_BUILDERS.get(provider_type)
+        if builder is None:
+            logger.error(f"Unsupported provider type: {provider_type}")
+            raise ValueError(f"Unsupported provider type: {provider_type}")
+        
         try:
-            if provider_type == 'azure_openai':
-                from langchain_openai import AzureChatOpenAI
-                return AzureChatOpenAI(
-                    model=llm_config['model'],
-                    azure_endpoint=llm_config['api_base'],
-                    azure_deployment=llm_config['deployment_name'],  # AzureChatOpenAI uses 'azure_deployment'
-                    openai_api_version=llm_config['api_version'],
-                    api_key=llm_config['api_key'],
-                    temperature=0.0
-                )
-            
-            elif provider_type == 'openai':
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    api_key=llm_config['api_key'],
-                    model=llm_config['model'],
-                    base_url=llm_config.get('base_url'),
-                    temperature=0.0
-                )
-            
-            elif provider_type == 'anthropic':
-                from langchain_anthropic import ChatAnthropic
-                return ChatAnthropic(
-                    api_key=llm_config['api_key'],
-                    model=llm_config['model'],
-                    base_url=llm_config.get('base_url'),
-                    temperature=0.0
-                )
-            
-            elif provider_type == 'google':
-                from langchain_google_genai import ChatGoogleGenerativeAI
-                return ChatGoogleGenerativeAI(
-                    google_api_key=llm_config['api_key'],
-                    model=llm_config['model'],
-                    temperature=0.0
-                )
-            
-            elif provider_type == 'ollama':
-                from langchain_community.llms import Ollama
-                return Ollama(
-                    base_url=llm_config['base_url'],
-                    model=llm_config['model'],
-                    temperature=0.0
-                )
-            
-            else:
-                logger.error(f"Unsupported provider type: {provider_type}")
-                raise ValueError(f"Unsupported provider type: {provider_type}")
-                
+            return builder(llm_config)
         except ImportError as e:
             logger.error(f"Missing dependency for {provider_type}: {e}")
-            raise ImportError(f"Missing dependency for {provider_type}. Install the required package.")
\ No newline at end of file
+            raise ImportError(f"Missing dependency for {provider_type}. Install the required package.")
+
+
+def _build_azure_openai(llm_config: dict):
+    """Create an Azure OpenAI chat model."""
+    from langchain_openai import AzureChatOpenAI
+    return AzureChatOpenAI(
+        model=llm_config['model'],
+        azure_endpoint=llm_config['api_base'],
+        azure_deployment=llm_config['deployment_name'],  # AzureChatOpenAI uses 'azure_deployment'
+        openai_api_version=llm_config['api_version'],
+        api_key=llm_config['api_key'],
+        temperature=0.0
+    )
+
+
+def _build_openai(llm_config: dict):
+    """Create an OpenAI chat model."""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        api_key=llm_config['api_key'],
+        model=llm_config['model'],
+        base_url=llm_config.get('base_url'),
+        temperature=0.0
+    )
+
+
+def _build_anthropic(llm_config: dict):
+    """Create an Anthropic Claude chat model."""
+    from langchain_anthropic import ChatAnthropic
+    return ChatAnthropic(
+        api_key=llm_config['api_key'],
+        model=llm_config['model'],
+        base_url=llm_config.get('base_url'),
+        temperature=0.0
+    )
+
+
+def _build_google(llm_config: dict):
+    """Create a Google Gemini chat model."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        google_api_key=llm_config['api_key'],
+        model=llm_config['model'],
+        temperature=0.0
+    )
+
+
+def _build_ollama(llm_config: dict):
+    """Create an Ollama model."""
+    from langchain_community.llms import Ollama
+    return Ollama(
+        base_url=llm_config['base_url'],
+        model=llm_config['model'],
+        temperature=0.0
+    )
+
+
+# LLM instance builders by provider type
+_INSTANCE_BUILDERS = {
+    'azure_openai': _build_azure_openai,
+    'openai': _build_openai,
+    'anthropic': _build_anthropic,
+    'google': _build_google,
+    'ollama': _build_ollama
+}
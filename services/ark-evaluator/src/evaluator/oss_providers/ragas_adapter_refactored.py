@@ -3,16 +3,39 @@ RAGAS-based LLM evaluation adapter for Langfuse integration (Refactored).
 Supports multiple LLM providers with improved separation of concerns.
 """
 
+import asyncio
+import concurrent.futures
 import logging
-from typing import Dict, List, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Set, Tuple
 from ..types import EvaluationParameters
 from .uvloop_handler import UVLoopHandler
 from .azure_openai_configurator import AzureOpenAIConfigurator
 from .ragas_evaluator import RagasEvaluator
-from .llm_provider import LLMProvider
+from .ragas_batcher import RagasBatcher
+from .llm_provider import LLMProvider, config_cache_key
 
 logger = logging.getLogger(__name__)
 
+# Configured (llm, embeddings, ragas_metrics, batcher) stacks, keyed by provider configuration
+# and requested metrics. Shared across adapter instances, least recently used evicted first.
+_METRIC_CACHE_MAX_SIZE = 32
+_metric_cache: "OrderedDict[tuple, Tuple[Any, Any, List[Any], RagasBatcher]]" = OrderedDict()
+_metric_cache_lock = threading.Lock()
+
+# Builds in progress, so concurrent misses for one key build the stack once.
+# Thread-safe futures, since waiters may run on another event loop.
+_metric_builds: Dict[tuple, concurrent.futures.Future] = {}
+
+# Embeddings builders by provider type, providers without one run without embeddings
+_EMBEDDINGS_BUILDERS = {
+    'azure_openai': AzureOpenAIConfigurator.create_azure_embeddings
+}
+
+# LLM/embeddings configurations whose connectivity has already been tested
+_probed_configs: Set[tuple] = set()
+
 
 class RagasAdapter:
     """
@@ -21,11 +44,20 @@ class RagasAdapter:
     """
     
     def __init__(self):
-        self.llm_provider = LLMProvider()
+        self._llm_provider = None
         self.uvloop_handler = UVLoopHandler()
         self.azure_configurator = AzureOpenAIConfigurator()
         self.ragas_evaluator = RagasEvaluator()
     
+    @property
+    def llm_provider(self):
+        """
+        LLM provider, created on first use so fallback-only paths never load it.
+        """
+        if self._llm_provider is None:
+            self._llm_provider = LLMProvider()
+        return self._llm_provider
+    
     async def evaluate(
         self,
         input_text: str,
@@ -45,6 +77,12 @@ class RagasAdapter:
         Returns:
             Dictionary of metric scores
         """
+        # Without RAGAS only fallback scoring is possible, skip LLM and loop setup
+        if not self.ragas_evaluator.is_available():
+            return self.ragas_evaluator.get_fallback_scores(
+                input_text, output_text, metrics
+            )
+        
         try:
             # Use UVLoopHandler to determine execution strategy
             if self.uvloop_handler.detect_uvloop():
@@ -77,34 +115,11 @@ class RagasAdapter:
         params: dict
     ) -> Dict[str, float]:
         """
-        Run evaluation with UV loop handling in a separate thread.
+        Run evaluation on the shared background asyncio loop.
         """
-        # Extract Azure environment variables if needed
-        env_vars = self.azure_configurator.extract_azure_env_vars(params)
-        
-        # Create a wrapper function for thread execution
-        def run_in_thread():
-            import asyncio
-            
-            # Create clean event loop
-            loop = self.uvloop_handler.create_clean_event_loop()
-            
-            try:
-                # Run evaluation in the clean loop
-                return loop.run_until_complete(
-                    self._run_evaluation(input_text, output_text, metrics, params)
-                )
-            finally:
-                loop.close()
-        
-        # Wrap the function with environment variables if needed
-        if env_vars:
-            wrapped_func = self.uvloop_handler.wrap_sync_for_thread(
-                run_in_thread, env_vars
-            )
-            return self.uvloop_handler.run_in_thread_with_clean_loop(wrapped_func)
-        else:
-            return self.uvloop_handler.run_in_thread_with_clean_loop(run_in_thread)
+        return await self.uvloop_handler.run_in_background_loop(
+            self._run_evaluation(input_text, output_text, metrics, params)
+        )
     
     async def _run_evaluation(
         self,
@@ -121,55 +136,171 @@ class RagasAdapter:
             provider_type, llm_config = self.llm_provider.detect_provider(params)
             logger.info(f"Detected LLM provider: {provider_type}")
             
-            # Create LLM instance
-            langchain_llm = self.llm_provider.create_instance(provider_type, llm_config)
-            
-            # Wrap LLM for RAGAS
-            from ragas.llms import LangchainLLMWrapper
-            llm = LangchainLLMWrapper(langchain_llm)
-            logger.info(f"Wrapped {provider_type} LLM for RAGAS")
-            
-            # Create embeddings if using Azure
-            embeddings = None
-            if provider_type == 'azure_openai':
-                embeddings = self.azure_configurator.create_azure_embeddings(
-                    llm_config, params
-                )
-            
-            # Test connectivity
-            llm_ok, embed_ok = await self.azure_configurator.test_azure_connectivity(
-                langchain_llm, embeddings
-            )
-            if not llm_ok:
-                logger.warning("LLM connectivity test failed, but continuing")
-            
-            # Initialize RAGAS metrics
-            ragas_metrics = self.ragas_evaluator.initialize_ragas_metrics(
-                metrics, llm, embeddings
+            # Get LLM, embeddings, initialized RAGAS metrics and their batcher
+            cache_key = self._metric_cache_key(provider_type, llm_config, metrics, params)
+            llm, embeddings, ragas_metrics, batcher = await self._get_or_build_metrics(
+                cache_key, provider_type, llm_config, metrics, params
             )
             
             # Extract context from parameters
             eval_params = EvaluationParameters.from_request_params(params)
             
-            # Prepare dataset
-            dataset = self.ragas_evaluator.prepare_dataset(
+            # Prepare dataset row
+            row = self.ragas_evaluator.prepare_row(
                 input_text,
                 output_text,
                 eval_params.context,
                 eval_params.context_source
             )
             
-            # Run RAGAS evaluation
-            result = await self.ragas_evaluator.run_evaluation(
-                dataset, ragas_metrics
-            )
+            # Run RAGAS evaluation, batched with concurrent evaluations using the same metrics
+            result_row = await batcher.submit(row)
             
             # Extract and return scores
-            return self.ragas_evaluator.extract_scores(result, metrics)
+            return self.ragas_evaluator.extract_scores(result_row, metrics)
             
         except Exception as e:
             logger.error(f"Error in RAGAS evaluation: {e}")
             # Return fallback scores
             return self.ragas_evaluator.get_fallback_scores(
                 input_text, output_text, metrics
-            )
\ No newline at end of file
+            )
+    
+    async def _get_or_build_metrics(
+        self,
+        cache_key: tuple,
+        provider_type: str,
+        llm_config: dict,
+        metrics: List[str],
+        params: dict
+    ) -> Tuple[Any, Any, List[Any], RagasBatcher]:
+        """
+        Get the configured LLM, embeddings and RAGAS metrics for a provider,
+        with the batcher evaluating rows against them, building and caching
+        them on first use. Concurrent misses for the same key wait for a
+        single build.
+        
+        Args:
+            cache_key: Cache key from _metric_cache_key
+            provider_type: Detected LLM provider type
+            llm_config: LLM configuration for the provider
+            metrics: List of metrics to compute
+            params: Evaluation parameters
+            
+        Returns:
+            Tuple of (ragas_llm, ragas_embeddings, ragas_metrics, batcher)
+        """
+        with _metric_cache_lock:
+            cached = _metric_cache.get(cache_key)
+            if cached is not None:
+                _metric_cache.move_to_end(cache_key)
+            else:
+                build = _metric_builds.get(cache_key)
+                is_builder = build is None
+                if is_builder:
+                    build = concurrent.futures.Future()
+                    _metric_builds[cache_key] = build
+        if cached is not None:
+            logger.debug(f"Reusing cached RAGAS metrics for {provider_type}")
+            return cached
+        if not is_builder:
+            logger.debug(f"Waiting for RAGAS metrics being built for {provider_type}")
+            return await asyncio.wrap_future(build)
+        
+        try:
+            llm, embeddings, ragas_metrics = await self._build_metrics(
+                provider_type, llm_config, metrics, params
+            )
+        except BaseException as e:
+            with _metric_cache_lock:
+                _metric_builds.pop(cache_key, None)
+            build.set_exception(
+                e if isinstance(e, Exception) else RuntimeError("RAGAS metric build was cancelled")
+            )
+            raise
+        
+        # The batcher lives as long as the cache entry holding its metrics
+        built = (llm, embeddings, ragas_metrics, RagasBatcher(ragas_metrics))
+        with _metric_cache_lock:
+            _metric_builds.pop(cache_key, None)
+            _metric_cache[cache_key] = built
+            _metric_cache.move_to_end(cache_key)
+            while len(_metric_cache) > _METRIC_CACHE_MAX_SIZE:
+                _, (_, _, _, evicted_batcher) = _metric_cache.popitem(last=False)
+                # Rows already queued are still evaluated
+                evicted_batcher.close()
+        build.set_result(built)
+        
+        return built
+    
+    async def _build_metrics(
+        self,
+        provider_type: str,
+        llm_config: dict,
+        metrics: List[str],
+        params: dict
+    ) -> Tuple[Any, Any, List[Any]]:
+        """
+        Build the LLM, embeddings and RAGAS metrics for a provider configuration.
+        """
+        # Create LLM instance
+        langchain_llm = self.llm_provider.create_instance(provider_type, llm_config)
+        
+        # Wrap LLM for RAGAS
+        llm = self.ragas_evaluator.wrap_llm(langchain_llm)
+        logger.info(f"Wrapped {provider_type} LLM for RAGAS")
+        
+        # Create embeddings for providers that have an embeddings builder
+        embeddings = None
+        embeddings_builder = _EMBEDDINGS_BUILDERS.get(provider_type)
+        if embeddings_builder is not None:
+            embeddings = embeddings_builder(llm_config, params)
+        
+        # Test connectivity once per process for each LLM/embeddings configuration
+        probe_key = self._client_cache_key(provider_type, llm_config, params)
+        if probe_key not in _probed_configs:
+            _probed_configs.add(probe_key)
+            llm_ok, embed_ok = await self.azure_configurator.test_azure_connectivity(
+                langchain_llm, embeddings
+            )
+            if not llm_ok:
+                logger.warning("LLM connectivity test failed, but continuing")
+        
+        # Initialize RAGAS metrics
+        ragas_metrics = self.ragas_evaluator.initialize_ragas_metrics(
+            metrics, llm, embeddings
+        )
+        
+        return llm, embeddings, ragas_metrics
+    
+    @staticmethod
+    def _client_cache_key(
+        provider_type: str,
+        llm_config: dict,
+        params: dict
+    ) -> tuple:
+        """
+        Build the key identifying an LLM/embeddings client configuration.
+        API keys are hashed so secrets are not kept in the key.
+        """
+        return (
+            provider_type,
+            config_cache_key(llm_config),
+            params.get('langfuse.azure_embedding_deployment'),
+            params.get('langfuse.azure_embedding_model')
+        )
+    
+    @staticmethod
+    def _metric_cache_key(
+        provider_type: str,
+        llm_config: dict,
+        metrics: List[str],
+        params: dict
+    ) -> tuple:
+        """
+        Build the metric cache key from the client configuration and requested metrics.
+        """
+        return (
+            RagasAdapter._client_cache_key(provider_type, llm_config, params),
+            frozenset(metrics)
+        )
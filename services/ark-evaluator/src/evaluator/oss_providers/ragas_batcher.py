@@ -0,0 +1,189 @@
+"""
+RAGAS Batcher for combining concurrent evaluations into a single RAGAS run.
+Amortizes RAGAS evaluation setup across requests that share the same metrics.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .ragas_evaluator import RagasEvaluator
+
+logger = logging.getLogger(__name__)
+
+# Queued after the last row to stop a worker once it has drained its queue
+_STOP = object()
+
+
+class RagasBatcher:
+    """
+    Collects dataset rows submitted concurrently and evaluates them together.
+
+    Rows are queued until either batch_size rows are pending or max_wait_ms
+    has passed since the first row of the batch arrived. The combined dataset
+    is evaluated with one RAGAS call and each caller receives its own row.
+    """
+
+    DEFAULT_BATCH_SIZE = int(os.getenv("RAGAS_BATCH_SIZE", "8"))
+    DEFAULT_MAX_WAIT_MS = float(os.getenv("RAGAS_BATCH_MAX_WAIT_MS", "50"))
+
+    def __init__(
+        self,
+        ragas_metrics: List[Any],
+        batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        self.ragas_metrics = ragas_metrics
+        self.batch_size = max(1, batch_size or self.DEFAULT_BATCH_SIZE)
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else self.DEFAULT_MAX_WAIT_MS) / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def submit(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a dataset row for evaluation and wait for its result.
+
+        Args:
+            row: RAGAS dataset row
+
+        Returns:
+            The RAGAS result row for the submitted row
+        """
+        if self._closed:
+            raise RuntimeError("RAGAS batcher closed")
+
+        loop = asyncio.get_running_loop()
+
+        # The queue and worker are bound to the loop they were created on
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._stop_worker()
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._drain(self._queue))
+
+        future = loop.create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    def close(self) -> None:
+        """
+        Stop accepting rows and stop the worker once queued rows are evaluated.
+
+        Safe to call from any thread. Rows already submitted still get results.
+        """
+        self._closed = True
+        self._stop_worker()
+
+    def _stop_worker(self) -> None:
+        """
+        Detach the current worker and let it exit after draining its queue.
+        """
+        loop, queue, worker = self._loop, self._queue, self._worker
+        self._loop = self._queue = self._worker = None
+        if worker is None or worker.done():
+            return
+
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, _STOP)
+        except RuntimeError:
+            # The loop is closed, its worker and futures can no longer run
+            pass
+
+    @staticmethod
+    def _take_queued(queue: asyncio.Queue) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        """
+        Remove and return the rows still waiting in a queue.
+        """
+        rows = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not _STOP:
+                rows.append(item)
+        return rows
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Dict[str, Any], asyncio.Future]], error: BaseException) -> None:
+        """
+        Resolve every unresolved future in a batch with an exception.
+        """
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _drain(self, queue: asyncio.Queue) -> None:
+        """
+        Collect queued rows into batches and evaluate them, until stopped.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        stopping = False
+
+        try:
+            while not (stopping and queue.empty()):
+                item = await queue.get()
+                if item is _STOP:
+                    stopping = True
+                    continue
+
+                batch = [item]
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.batch_size:
+                    if stopping:
+                        # Don't wait for rows that will never arrive
+                        if queue.empty():
+                            break
+                        item = queue.get_nowait()
+                    else:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+
+                    if item is _STOP:
+                        stopping = True
+                    else:
+                        batch.append(item)
+
+                # Run batches concurrently; RagasEvaluator bounds concurrent RAGAS runs
+                task = loop.create_task(self._run_batch(batch))
+                self._batch_tasks.add(task)
+                task.add_done_callback(self._batch_tasks.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # Rows that never reached a batch
+            self._fail(batch + self._take_queued(queue), RuntimeError("RAGAS batcher cancelled"))
+            raise
+        except Exception as e:
+            logger.error(f"RAGAS batcher worker failed: {e}")
+            self._fail(batch + self._take_queued(queue), e)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """
+        Evaluate a batch of rows and resolve each caller's future.
+        """
+        logger.info(f"Running RAGAS batch with {len(batch)} rows")
+
+        try:
+            dataset = RagasEvaluator.build_dataset([row for row, _ in batch])
+            result = await RagasEvaluator.run_evaluation(dataset, self.ragas_metrics)
+            result_rows = RagasEvaluator.result_rows(result)
+
+            if len(result_rows) != len(batch):
+                raise ValueError(
+                    f"RAGAS returned {len(result_rows)} rows for a batch of {len(batch)}"
+                )
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        for (_, future), result_row in zip(batch, result_rows):
+            if not future.done():
+                future.set_result(result_row)
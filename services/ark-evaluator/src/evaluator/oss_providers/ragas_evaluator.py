@@ -3,12 +3,164 @@ RAGAS Evaluator for running RAGAS-specific evaluation logic.
 Encapsulates RAGAS metrics initialization, dataset preparation, and evaluation execution.
 """
 
+import asyncio
+import copy
+import functools
+import importlib.util
 import logging
-import math
-from typing import Dict, List, Any, Optional, Tuple
+import os
+import re
+import weakref
+from math import isnan
+from types import MappingProxyType, SimpleNamespace
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Limits for RAGAS runs, to stay within provider rate limits under load.
+# At most RAGAS_MAX_CONCURRENT * RAGAS_MAX_WORKERS LLM calls are in flight per loop.
+RAGAS_MAX_CONCURRENT = int(os.getenv("RAGAS_MAX_CONCURRENT", "2"))
+RAGAS_MAX_WORKERS = int(os.getenv("RAGAS_MAX_WORKERS", "4"))
+RAGAS_MAX_RETRIES = int(os.getenv("RAGAS_MAX_RETRIES", "10"))
+RAGAS_MAX_WAIT = int(os.getenv("RAGAS_MAX_WAIT", "120"))
+RAGAS_TIMEOUT = int(os.getenv("RAGAS_TIMEOUT", "180"))
+
+# One semaphore per event loop, since asyncio primitives are bound to a loop
+_evaluation_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Fallback heuristics, compiled once
+_TOXIC_RE = re.compile(r'\b(hate|stupid|idiot|kill|die|worst)\b', re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[\w']+")
+
+
+def _tokens(text: str) -> FrozenSet[str]:
+    """
+    Split text into a set of lowercase word tokens, ignoring punctuation.
+    """
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+
+@functools.lru_cache(maxsize=4096)
+def _input_tokens(text: str) -> FrozenSet[str]:
+    """
+    Tokenize an evaluation input, cached because the same input is often
+    evaluated against many outputs.
+    """
+    return _tokens(text)
+
+
+@functools.lru_cache(maxsize=1)
+def _ragas_symbols() -> SimpleNamespace:
+    """
+    Import the RAGAS components used by the evaluator once per process.
+    
+    RAGAS pulls in a large import graph, so the resolved symbols are cached
+    instead of being re-imported on every evaluation. Import failures are not
+    cached and will be retried on the next call.
+    """
+    from ragas import aevaluate
+    from ragas.llms import LangchainLLMWrapper
+    from ragas.metrics import (
+        answer_relevancy,
+        answer_correctness,
+        answer_similarity,
+        faithfulness
+    )
+    from ragas.metrics.base import MetricWithLLM, MetricWithEmbeddings
+    from ragas.run_config import RunConfig
+    
+    return SimpleNamespace(
+        aevaluate=aevaluate,
+        LangchainLLMWrapper=LangchainLLMWrapper,
+        answer_relevancy=answer_relevancy,
+        answer_correctness=answer_correctness,
+        answer_similarity=answer_similarity,
+        faithfulness=faithfulness,
+        MetricWithLLM=MetricWithLLM,
+        MetricWithEmbeddings=MetricWithEmbeddings,
+        RunConfig=RunConfig
+    )
+
+
+def _build_run_config() -> Any:
+    """
+    Build the RAGAS RunConfig with retry, backoff and worker limits.
+    
+    RAGAS retries rate-limited LLM calls with exponential backoff up to
+    max_retries attempts, waiting at most max_wait seconds between attempts.
+    """
+    return _ragas_symbols().RunConfig(
+        max_workers=RAGAS_MAX_WORKERS,
+        max_retries=RAGAS_MAX_RETRIES,
+        max_wait=RAGAS_MAX_WAIT,
+        timeout=RAGAS_TIMEOUT
+    )
+
+
+def _evaluation_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore limiting concurrent RAGAS runs on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _evaluation_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(RAGAS_MAX_CONCURRENT)
+        _evaluation_semaphores[loop] = semaphore
+    return semaphore
+
+
+@functools.lru_cache(maxsize=1)
+def _ragas_available() -> bool:
+    """
+    Check once per process whether RAGAS is installed.
+    
+    Only looks the package up without importing it: importing RAGAS applies
+    nest_asyncio to the running loop, which raises on uvloop. The import
+    itself happens during evaluation, on a loop RAGAS supports.
+    """
+    if importlib.util.find_spec("ragas") is None:
+        logger.warning("RAGAS is not installed, evaluations will use fallback scoring")
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _ragas_metric_map() -> Dict[str, Any]:
+    """
+    Map our metric names to RAGAS metric objects, built once from METRIC_MAPPINGS.
+    """
+    ragas = _ragas_symbols()
+    return {
+        metric: getattr(ragas, ragas_name)
+        for metric, ragas_name in RagasEvaluator.METRIC_MAPPINGS.items()
+        if ragas_name is not None
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _evaluation_dataset_classes() -> Optional[Tuple[Any, Any]]:
+    """
+    Import RAGAS's native dataset schema once per process.
+    
+    Returns:
+        Tuple of (EvaluationDataset, SingleTurnSample), or None if this RAGAS
+        version doesn't provide them
+    """
+    try:
+        from ragas.dataset_schema import EvaluationDataset, SingleTurnSample
+    except ImportError:
+        return None
+    return EvaluationDataset, SingleTurnSample
+
+
+@functools.lru_cache(maxsize=1)
+def _dataset_class() -> Any:
+    """Import the HuggingFace Dataset class once per process."""
+    from datasets import Dataset
+    return Dataset
+
 
 class RagasEvaluator:
     """
@@ -16,8 +168,8 @@ class RagasEvaluator:
     dataset preparation, and evaluation execution.
     """
     
-    # RAGAS metric mappings
-    METRIC_MAPPINGS = {
+    # RAGAS metric mappings (read-only, shared by all evaluators)
+    METRIC_MAPPINGS = MappingProxyType({
         'relevance': 'answer_relevancy',
         'correctness': 'answer_correctness',
         'similarity': 'answer_similarity',
@@ -25,7 +177,30 @@ class RagasEvaluator:
         'toxicity': None,  # RAGAS doesn't have built-in toxicity
         'helpfulness': 'answer_relevancy',  # Use relevancy as proxy
         'clarity': 'answer_similarity'  # Use similarity as proxy
-    }
+    })
+    
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Check whether RAGAS is installed.
+        
+        Returns:
+            True if RAGAS evaluation can run, False if only fallback scoring is possible
+        """
+        return _ragas_available()
+    
+    @staticmethod
+    def wrap_llm(langchain_llm: Any) -> Any:
+        """
+        Wrap a LangChain LLM instance for use by RAGAS metrics.
+        
+        Args:
+            langchain_llm: The LangChain LLM instance
+            
+        Returns:
+            RAGAS-wrapped LLM instance
+        """
+        return _ragas_symbols().LangchainLLMWrapper(langchain_llm)
     
     @staticmethod
     def initialize_ragas_metrics(
@@ -45,91 +220,86 @@ class RagasEvaluator:
             List of initialized RAGAS metric instances
         """
         try:
-            from ragas.metrics import (
-                answer_relevancy,
-                answer_correctness,
-                answer_similarity,
-                faithfulness
-            )
-            from ragas.metrics.base import MetricWithLLM, MetricWithEmbeddings
-            from ragas.run_config import RunConfig
+            ragas = _ragas_symbols()
         except ImportError as e:
             logger.error(f"Failed to import RAGAS components: {e}")
             raise
         
         # Map our metrics to RAGAS metrics
-        ragas_metric_map = {
-            'relevance': answer_relevancy,
-            'correctness': answer_correctness,
-            'similarity': answer_similarity,
-            'faithfulness': faithfulness,
-            'helpfulness': answer_relevancy,
-            'clarity': answer_similarity
-        }
+        ragas_metric_map = _ragas_metric_map()
+        run_config = _build_run_config()
         
         supported_metrics = []
         
         for metric in metrics:
-            if metric not in ragas_metric_map or ragas_metric_map[metric] is None:
+            # Get the RAGAS metric class/instance
+            ragas_metric = ragas_metric_map.get(metric)
+            if ragas_metric is None:
                 logger.warning(f"Metric '{metric}' not supported by RAGAS, skipping")
                 continue
             
-            # Get the RAGAS metric class/instance
-            ragas_metric = ragas_metric_map[metric]
-            
-            # Create fresh instance if needed
-            if hasattr(ragas_metric, '__call__') and not hasattr(ragas_metric, 'name'):
-                # It's a metric class/function, instantiate it
-                metric_instance = ragas_metric()
-            else:
-                # It's already an instance
-                metric_instance = ragas_metric
-            
-            # Configure the metric with our LLM and embeddings
-            if isinstance(metric_instance, MetricWithLLM):
-                metric_instance.llm = llm
-                logger.debug(f"Configured {metric} with LLM")
-            
-            if isinstance(metric_instance, MetricWithEmbeddings):
-                if embeddings:
-                    metric_instance.embeddings = embeddings
-                    logger.info(f"Configured {metric} with embeddings")
-                else:
-                    logger.warning(f"Metric {metric} needs embeddings but none provided")
-            
-            # Initialize the metric
-            run_config = RunConfig()
-            metric_instance.init(run_config)
-            
-            supported_metrics.append(metric_instance)
+            supported_metrics.append(RagasEvaluator._configure_metric(
+                metric, ragas_metric, llm, embeddings, run_config
+            ))
             logger.debug(f"Initialized RAGAS metric: {metric}")
         
         # If no supported metrics, use default
         if not supported_metrics:
             logger.warning("No supported RAGAS metrics found, using answer_relevancy as default")
-            default_metric = answer_relevancy()
-            
-            if isinstance(default_metric, MetricWithLLM):
-                default_metric.llm = llm
-            if isinstance(default_metric, MetricWithEmbeddings) and embeddings:
-                default_metric.embeddings = embeddings
-            
-            run_config = RunConfig()
-            default_metric.init(run_config)
-            supported_metrics = [default_metric]
+            supported_metrics = [RagasEvaluator._configure_metric(
+                'relevance', ragas.answer_relevancy, llm, embeddings, run_config
+            )]
         
         logger.info(f"Initialized {len(supported_metrics)} RAGAS metrics")
         return supported_metrics
     
     @staticmethod
-    def prepare_dataset(
+    def _configure_metric(
+        metric: str,
+        ragas_metric: Any,
+        llm: Any,
+        embeddings: Optional[Any],
+        run_config: Any
+    ) -> Any:
+        """
+        Create a RAGAS metric instance configured with our LLM and embeddings.
+        """
+        ragas = _ragas_symbols()
+        
+        # Create fresh instance if needed
+        if hasattr(ragas_metric, '__call__') and not hasattr(ragas_metric, 'name'):
+            # It's a metric class/function, instantiate it
+            metric_instance = ragas_metric()
+        else:
+            # It's a shared module-level instance, copy it so configured
+            # metrics cached for different LLMs don't overwrite each other
+            metric_instance = copy.copy(ragas_metric)
+        
+        # Configure the metric with our LLM and embeddings
+        if isinstance(metric_instance, ragas.MetricWithLLM):
+            metric_instance.llm = llm
+            logger.debug(f"Configured {metric} with LLM")
+        
+        if isinstance(metric_instance, ragas.MetricWithEmbeddings):
+            if embeddings:
+                metric_instance.embeddings = embeddings
+                logger.info(f"Configured {metric} with embeddings")
+            else:
+                logger.warning(f"Metric {metric} needs embeddings but none provided")
+        
+        # Initialize the metric
+        metric_instance.init(run_config)
+        return metric_instance
+    
+    @staticmethod
+    def prepare_row(
         input_text: str,
         output_text: str,
         context: Optional[str] = None,
         context_source: Optional[str] = None
-    ) -> Any:
+    ) -> Dict[str, Any]:
         """
-        Prepare dataset for RAGAS evaluation.
+        Prepare a single dataset row for RAGAS evaluation.
         
         Args:
             input_text: The input/question text
@@ -138,14 +308,8 @@ class RagasEvaluator:
             context_source: Source of the context
             
         Returns:
-            RAGAS-compatible dataset
+            RAGAS dataset row, using the field names of the installed RAGAS version
         """
-        try:
-            from datasets import Dataset
-        except ImportError as e:
-            logger.error(f"Failed to import datasets library: {e}")
-            raise
-        
         # Prepare contexts for RAGAS evaluation
         if context:
             logger.info(f"Using evaluation context from {context_source or 'unknown'}, length: {len(context)} characters")
@@ -154,27 +318,88 @@ class RagasEvaluator:
             logger.info("No context provided, using default context for evaluation")
             contexts = ["No specific context provided"]
         
-        # Create dataset entry with all possible field names for compatibility
-        dataset_entry = {
-            # Standard RAGAS fields
+        # Use the field names of the installed RAGAS version only
+        if _evaluation_dataset_classes() is not None:
+            return {
+                'user_input': input_text,
+                'response': output_text,
+                'retrieved_contexts': contexts,
+                'reference': output_text  # Use output as reference for similarity
+            }
+        
+        # Legacy RAGAS field names
+        return {
             'question': input_text,
             'answer': output_text,
             'contexts': contexts,
-            'ground_truth': output_text,  # Use output as ground truth for similarity
-            
-            # Alternative field names for compatibility
-            'user_input': input_text,
-            'response': output_text,
-            'retrieved_contexts': contexts,
-            'reference': output_text
+            'ground_truth': output_text  # Use output as ground truth for similarity
         }
+    
+    @staticmethod
+    def build_dataset(rows: List[Dict[str, Any]]) -> Any:
+        """
+        Build a RAGAS-compatible dataset from prepared rows.
+        
+        Uses RAGAS's EvaluationDataset directly, which avoids the pyarrow table
+        construction of a HuggingFace Dataset. Falls back to Dataset.from_list
+        on RAGAS versions without the dataset schema.
+        
+        Args:
+            rows: Dataset rows created by prepare_row, which picks the field
+                names matching the dataset type used here
+            
+        Returns:
+            RAGAS-compatible dataset
+        """
+        schema = _evaluation_dataset_classes()
+        if schema is not None:
+            EvaluationDataset, SingleTurnSample = schema
+            eval_dataset = EvaluationDataset(samples=[
+                SingleTurnSample(
+                    user_input=row['user_input'],
+                    response=row['response'],
+                    retrieved_contexts=row['retrieved_contexts'],
+                    reference=row['reference']
+                )
+                for row in rows
+            ])
+            logger.debug(f"Created RAGAS dataset with {len(eval_dataset)} entries")
+            return eval_dataset
+        
+        try:
+            Dataset = _dataset_class()
+        except ImportError as e:
+            logger.error(f"Failed to import datasets library: {e}")
+            raise
         
-        # Create dataset
-        eval_dataset = Dataset.from_list([dataset_entry])
+        eval_dataset = Dataset.from_list(rows)
         logger.debug(f"Created RAGAS dataset with {len(eval_dataset)} entries")
         
         return eval_dataset
     
+    @staticmethod
+    def prepare_dataset(
+        input_text: str,
+        output_text: str,
+        context: Optional[str] = None,
+        context_source: Optional[str] = None
+    ) -> Any:
+        """
+        Prepare a single-row dataset for RAGAS evaluation.
+        
+        Args:
+            input_text: The input/question text
+            output_text: The output/answer text
+            context: Optional context for evaluation
+            context_source: Source of the context
+            
+        Returns:
+            RAGAS-compatible dataset
+        """
+        return RagasEvaluator.build_dataset([
+            RagasEvaluator.prepare_row(input_text, output_text, context, context_source)
+        ])
+    
     @staticmethod
     async def run_evaluation(
         dataset: Any,
@@ -191,18 +416,21 @@ class RagasEvaluator:
             Dictionary of metric scores
         """
         try:
-            from ragas import evaluate as ev_ragas
+            ragas = _ragas_symbols()
         except ImportError as e:
-            logger.error(f"Failed to import RAGAS evaluate function: {e}")
+            logger.error(f"Failed to import RAGAS aevaluate function: {e}")
             raise
         
         logger.info(f"Running RAGAS evaluation with {len(metrics)} metrics")
         
         try:
-            result = ev_ragas(
-                dataset=dataset,
-                metrics=metrics
-            )
+            async with _evaluation_semaphore():
+                # Native async evaluation, other evaluations keep running on this loop
+                result = await ragas.aevaluate(
+                    dataset=dataset,
+                    metrics=metrics,
+                    run_config=_build_run_config()
+                )
             
             logger.info("RAGAS evaluation completed successfully")
             return result
@@ -211,56 +439,65 @@ class RagasEvaluator:
             logger.error(f"RAGAS evaluation failed: {eval_e}")
             raise
     
+    @staticmethod
+    def result_rows(result: Any) -> List[Dict[str, Any]]:
+        """
+        Convert a RAGAS evaluation result into one dictionary per dataset row.
+        
+        Uses the per-row score dictionaries RAGAS keeps on the result, avoiding
+        a pandas DataFrame round trip. Falls back to to_pandas() for results
+        that don't expose scores.
+        
+        Args:
+            result: RAGAS evaluation result
+            
+        Returns:
+            List of result rows in dataset order
+        """
+        scores = getattr(result, 'scores', None)
+        if isinstance(scores, list):
+            return [dict(row) for row in scores]
+        
+        return result.to_pandas().to_dict('records')
+    
     @staticmethod
     def extract_scores(
-        result: Any,
+        result_dict: Dict[str, Any],
         requested_metrics: List[str]
     ) -> Dict[str, float]:
         """
-        Extract scores from RAGAS evaluation result.
+        Extract scores from a RAGAS evaluation result row.
         
         Args:
-            result: RAGAS evaluation result
+            result_dict: RAGAS result row for the evaluated entry
             requested_metrics: List of originally requested metrics
             
         Returns:
             Dictionary mapping metric names to scores
         """
-        scores = {}
-        
-        try:
-            # Convert result to dictionary
-            result_dict = result.to_pandas().to_dict('records')[0]
-        except Exception as e:
-            logger.error(f"Failed to extract RAGAS results: {e}")
-            return {metric: 0.5 for metric in requested_metrics}
+        # Default score for metrics without a RAGAS result
+        scores = dict.fromkeys(requested_metrics, 0.5)
         
         # Map RAGAS results back to our metric names
         for metric in requested_metrics:
-            value = None
-            
-            # Check for direct RAGAS metric name
             ragas_name = RagasEvaluator.METRIC_MAPPINGS.get(metric)
-            if ragas_name and ragas_name in result_dict:
-                value = result_dict[ragas_name]
-            
-            # Handle special cases and aliases
-            elif metric == 'helpfulness' and 'answer_relevancy' in result_dict:
-                value = result_dict['answer_relevancy']
-            elif metric == 'clarity' and 'answer_similarity' in result_dict:
-                value = result_dict['answer_similarity']
+            value = result_dict.get(ragas_name) if ragas_name else None
             
             # Process the value
-            if value is not None:
-                # Handle NaN values that can occur in RAGAS evaluation
-                if math.isnan(float(value)):
-                    logger.warning(f"RAGAS returned NaN for metric {metric}, using fallback score")
-                    scores[metric] = 0.7  # Reasonable fallback for NaN
-                else:
-                    scores[metric] = float(value)
-            else:
+            if value is None:
                 logger.warning(f"No RAGAS result found for metric: {metric}, using default")
-                scores[metric] = 0.5
+                continue
+            
+            # RAGAS returns floats already, only convert other numeric types
+            if not isinstance(value, float):
+                value = float(value)
+            
+            # Handle NaN values that can occur in RAGAS evaluation
+            if isnan(value):
+                logger.warning(f"RAGAS returned NaN for metric {metric}, using fallback score")
+                scores[metric] = 0.7  # Reasonable fallback for NaN
+            else:
+                scores[metric] = value
         
         logger.info(f"Extracted scores: {scores}")
         return scores
@@ -288,9 +525,9 @@ class RagasEvaluator:
         for metric in metrics:
             if metric == 'relevance':
                 # Simple word overlap
-                input_words = set(input_text.lower().split())
-                output_words = set(output_text.lower().split())
-                overlap = len(input_words.intersection(output_words))
+                input_words = _input_tokens(input_text)
+                output_words = _tokens(output_text)
+                overlap = len(input_words & output_words)
                 scores[metric] = min(1.0, overlap / max(len(input_words), 1))
             
             elif metric == 'correctness':
@@ -307,8 +544,8 @@ class RagasEvaluator:
             
             elif metric == 'toxicity':
                 # Simple toxicity check
-                toxic_words = ['hate', 'stupid', 'idiot', 'kill', 'die', 'worst']
-                toxic_count = sum(1 for word in toxic_words if word in output_text.lower())
+                # Count distinct toxic words found in a single pass
+                toxic_count = len({word.lower() for word in _TOXIC_RE.findall(output_text)})
                 scores[metric] = min(1.0, toxic_count / 3.0)
             
             else:
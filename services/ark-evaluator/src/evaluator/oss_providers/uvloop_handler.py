@@ -4,13 +4,28 @@ Handles detection and mitigation of uvloop conflicts for RAGAS evaluation.
 """
 
 import asyncio
+import functools
 import logging
 import threading
-import concurrent.futures
-from typing import Callable, Any, Dict
+from typing import Callable, Any, Coroutine, Optional
 
 logger = logging.getLogger(__name__)
 
+# Shared standard asyncio loop for RAGAS, started lazily by get_background_loop
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _is_uvloop_type(loop_type: type) -> bool:
+    """
+    Check whether an event loop class comes from uvloop, once per loop class.
+    """
+    is_uvloop = getattr(loop_type, '__module__', '').startswith('uvloop')
+    if is_uvloop:
+        logger.info(f"Detected uvloop: {loop_type}")
+    return is_uvloop
+
 
 class UVLoopHandler:
     """
@@ -18,73 +33,73 @@ class UVLoopHandler:
     
     This class handles the compatibility issues between uvloop and RAGAS by:
     1. Detecting if the current event loop is uvloop
-    2. Running RAGAS in a separate thread with a clean asyncio environment when needed
-    3. Properly managing event loop lifecycle in threads
+    2. Running RAGAS on a shared standard asyncio loop in a background thread when needed
+    3. Creating that loop once per process instead of once per evaluation
     """
     
     @staticmethod
     def detect_uvloop() -> bool:
         """
-        Detect if the current event loop is using uvloop.
+        Detect if the running event loop is using uvloop.
         
         Returns:
             bool: True if uvloop is detected, False otherwise
         """
         try:
-            current_loop = asyncio.get_event_loop()
-            is_uvloop = 'uvloop' in str(type(current_loop))
-            if is_uvloop:
-                logger.info(f"Detected uvloop: {type(current_loop)}")
-            return is_uvloop
+            current_loop = asyncio.get_running_loop()
         except RuntimeError:
-            logger.debug("No event loop found, uvloop not detected")
+            logger.debug("No running event loop, uvloop not detected")
             return False
+        return _is_uvloop_type(type(current_loop))
     
     @staticmethod
-    def run_in_thread_with_clean_loop(
-        sync_func: Callable,
-        *args,
-        **kwargs
-    ) -> Any:
+    def get_background_loop() -> asyncio.AbstractEventLoop:
         """
-        Run a function in a separate thread with a clean asyncio event loop.
+        Get the shared standard asyncio event loop used for RAGAS execution.
         
-        This is used to isolate RAGAS execution from uvloop environments.
+        The loop is created on first use and runs forever in a daemon thread,
+        so evaluations reuse one loop and thread instead of building a new
+        executor and event loop per call.
         
-        Args:
-            sync_func: The synchronous function to run in the thread
-            *args: Positional arguments for the function
-            **kwargs: Keyword arguments for the function
-            
         Returns:
-            The result from the function execution
+            A running asyncio event loop (not uvloop)
         """
-        logger.info(f"Running function in separate thread: {threading.current_thread().name}")
+        global _background_loop
         
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(sync_func, *args, **kwargs)
-            return future.result()
+        if _background_loop is None or _background_loop.is_closed():
+            with _background_loop_lock:
+                if _background_loop is None or _background_loop.is_closed():
+                    # Build the loop from the default policy directly so the
+                    # process-wide (uvloop) policy is left untouched
+                    loop = asyncio.DefaultEventLoopPolicy().new_event_loop()
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="ragas-event-loop",
+                        daemon=True
+                    )
+                    thread.start()
+                    _background_loop = loop
+                    logger.info(f"Started background event loop: {type(loop)}")
+        
+        return _background_loop
     
     @staticmethod
-    def create_clean_event_loop() -> asyncio.AbstractEventLoop:
+    async def run_in_background_loop(coro: Coroutine) -> Any:
         """
-        Create a clean asyncio event loop without uvloop.
+        Run a coroutine on the shared background loop and await its result.
         
-        This resets the event loop policy to default and creates a standard asyncio loop.
+        The calling loop is not blocked while the coroutine runs.
         
+        Args:
+            coro: The coroutine to run
+            
         Returns:
-            A new asyncio event loop (not uvloop)
+            The result of the coroutine
         """
-        # CRITICAL: Reset the event loop policy to default BEFORE creating the loop
-        # This ensures the thread doesn't inherit uvloop from the main thread
-        asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
-        
-        # Now create a standard asyncio loop (not uvloop)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        logger.info(f"Created clean event loop: {type(loop)}")
-        return loop
+        future = asyncio.run_coroutine_threadsafe(
+            coro, UVLoopHandler.get_background_loop()
+        )
+        return await asyncio.wrap_future(future)
     
     @staticmethod
     async def run_async_in_clean_loop(
@@ -104,65 +119,11 @@ class UVLoopHandler:
             The result from the async function
         """
         if UVLoopHandler.detect_uvloop():
-            logger.info("Detected uvloop, running in separate thread with clean loop")
-            
-            def run_in_thread():
-                loop = UVLoopHandler.create_clean_event_loop()
-                try:
-                    return loop.run_until_complete(async_func(*args, **kwargs))
-                except Exception as e:
-                    logger.error(f"Error in thread execution: {e}")
-                    raise
-                finally:
-                    loop.close()
-                    logger.info("Closed thread event loop")
-            
-            return UVLoopHandler.run_in_thread_with_clean_loop(run_in_thread)
+            logger.info("Detected uvloop, running on background asyncio loop")
+            return await UVLoopHandler.run_in_background_loop(
+                async_func(*args, **kwargs)
+            )
         else:
             # No uvloop, can run directly
             logger.debug("No uvloop detected, running directly")
             return await async_func(*args, **kwargs)
-    
-    @staticmethod
-    def wrap_sync_for_thread(
-        sync_func: Callable,
-        env_vars: Dict[str, str] = None
-    ) -> Callable:
-        """
-        Wrap a synchronous function to run in a thread with clean environment.
-        
-        Args:
-            sync_func: The synchronous function to wrap
-            env_vars: Optional environment variables to set in the thread
-            
-        Returns:
-            A wrapped function that runs in a clean thread
-        """
-        import os
-        
-        def wrapper(*args, **kwargs):
-            logger.info(f"Running wrapped function in thread: {threading.current_thread().name}")
-            
-            # Set environment variables if provided
-            env_vars_set = []
-            if env_vars:
-                for key, value in env_vars.items():
-                    os.environ[key] = value
-                    env_vars_set.append(key)
-                logger.info(f"Set environment variables in thread: {env_vars_set}")
-            
-            try:
-                # Create clean event loop and run the function
-                loop = UVLoopHandler.create_clean_event_loop()
-                try:
-                    return sync_func(*args, **kwargs)
-                finally:
-                    loop.close()
-            finally:
-                # Clean up environment variables
-                if env_vars_set:
-                    for var in env_vars_set:
-                        os.environ.pop(var, None)
-                    logger.info(f"Cleaned up environment variables: {env_vars_set}")
-        
-        return wrapper
\ No newline at end of file
@@ -0,0 +1,512 @@
+"""Test suite for the RAGAS adapter"""
+
+import asyncio
+import contextlib
+
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+from src.evaluator.oss_providers import llm_provider, ragas_adapter_refactored, ragas_evaluator
+from src.evaluator.oss_providers.azure_openai_configurator import AzureOpenAIConfigurator
+from src.evaluator.oss_providers.llm_provider import LLMProvider
+from src.evaluator.oss_providers.ragas_adapter_refactored import RagasAdapter
+from src.evaluator.oss_providers.ragas_batcher import RagasBatcher
+from src.evaluator.oss_providers.ragas_evaluator import RagasEvaluator
+from src.evaluator.oss_providers.uvloop_handler import UVLoopHandler
+
+
+AZURE_PARAMS = {
+    'langfuse.azure_api_key': 'test-key',
+    'langfuse.azure_endpoint': 'https://test.openai.azure.com/',
+    'langfuse.azure_deployment': 'gpt-4o',
+    'langfuse.model_version': '2024-02-01'
+}
+
+
+class TestRagasAdapterMetricCache:
+    """Test caching of configured RAGAS metrics"""
+
+    def setup_method(self):
+        """Set up an adapter with mocked LLM, embeddings and RAGAS components"""
+        ragas_adapter_refactored._metric_cache.clear()
+        ragas_adapter_refactored._probed_configs.clear()
+
+        self.adapter = RagasAdapter()
+        self.adapter._llm_provider = Mock()
+        self.adapter.llm_provider.create_instance.return_value = Mock()
+        self.adapter.azure_configurator = Mock()
+        self.adapter.azure_configurator.test_azure_connectivity = AsyncMock(return_value=(True, True))
+        self.create_embeddings = Mock(return_value=Mock())
+        self.embeddings_builders = patch.dict(
+            ragas_adapter_refactored._EMBEDDINGS_BUILDERS, {'azure_openai': self.create_embeddings}
+        )
+        self.embeddings_builders.start()
+        self.adapter.ragas_evaluator = Mock()
+        self.adapter.ragas_evaluator.initialize_ragas_metrics.side_effect = lambda metrics, llm, embeddings: [Mock()]
+
+    def teardown_method(self):
+        """Clear the shared metric cache"""
+        self.embeddings_builders.stop()
+        ragas_adapter_refactored._metric_cache.clear()
+        ragas_adapter_refactored._probed_configs.clear()
+
+    @pytest.mark.asyncio
+    async def test_metrics_built_once_per_configuration(self):
+        """Test that repeated evaluations reuse the configured metrics"""
+        llm_config = self.adapter_config()
+
+        first = await self.get_metrics(self.adapter, llm_config, ['relevance'])
+        second = await self.get_metrics(self.adapter, llm_config, ['relevance'])
+
+        assert first is second
+        assert first[1] is self.create_embeddings.return_value
+        assert self.adapter.llm_provider.create_instance.call_count == 1
+        assert self.create_embeddings.call_count == 1
+        assert self.adapter.azure_configurator.test_azure_connectivity.await_count == 1
+        assert self.adapter.ragas_evaluator.initialize_ragas_metrics.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_shared_across_adapter_instances(self):
+        """Test that a new adapter instance reuses metrics built by another"""
+        llm_config = self.adapter_config()
+        first = await self.get_metrics(self.adapter, llm_config, ['relevance'])
+
+        other = RagasAdapter()
+        second = await self.get_metrics(other, llm_config, ['relevance'])
+
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_different_configuration_rebuilds(self):
+        """Test that changing metrics or credentials builds a new stack"""
+        llm_config = self.adapter_config()
+        first = await self.get_metrics(self.adapter, llm_config, ['relevance'])
+        other_metrics = await self.get_metrics(self.adapter, llm_config, ['correctness'])
+        other_key = await self.get_metrics(self.adapter, dict(llm_config, api_key='rotated-key'), ['relevance'])
+
+        assert first is not other_metrics
+        assert first is not other_key
+        assert self.adapter.ragas_evaluator.initialize_ragas_metrics.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_connectivity_probed_once_per_client_configuration(self):
+        """Test that different metric sets on the same clients don't re-probe connectivity"""
+        llm_config = self.adapter_config()
+        await self.get_metrics(self.adapter, llm_config, ['relevance'])
+        await self.get_metrics(self.adapter, llm_config, ['correctness'])
+
+        assert self.adapter.azure_configurator.test_azure_connectivity.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_build_once(self):
+        """Test that concurrent misses for one configuration share a single build"""
+        async def slow_probe(llm, embeddings):
+            await asyncio.sleep(0.05)
+            return True, True
+
+        self.adapter.azure_configurator.test_azure_connectivity = AsyncMock(side_effect=slow_probe)
+        llm_config = self.adapter_config()
+
+        results = await asyncio.gather(*(
+            self.get_metrics(self.adapter, llm_config, ['relevance']) for _ in range(5)
+        ))
+
+        assert all(result is results[0] for result in results)
+        assert self.adapter.ragas_evaluator.initialize_ragas_metrics.call_count == 1
+        assert not ragas_adapter_refactored._metric_builds
+
+    @pytest.mark.asyncio
+    async def test_failed_build_is_shared_and_retried(self):
+        """Test that waiters get the build error and the next miss builds again"""
+        async def failing_probe(llm, embeddings):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("unreachable")
+
+        self.adapter.azure_configurator.test_azure_connectivity = AsyncMock(side_effect=failing_probe)
+        llm_config = self.adapter_config()
+
+        results = await asyncio.gather(
+            self.get_metrics(self.adapter, llm_config, ['relevance']),
+            self.get_metrics(self.adapter, llm_config, ['relevance']),
+            return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        await self.get_metrics(self.adapter, llm_config, ['relevance'])
+        assert self.adapter.ragas_evaluator.initialize_ragas_metrics.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_no_embeddings_for_providers_without_builder(self):
+        """Test that providers without an embeddings builder run without embeddings"""
+        config = {'provider': 'openai', 'api_key': 'test-key', 'model': 'gpt-4', 'base_url': None}
+        cache_key = RagasAdapter._metric_cache_key('openai', config, ['relevance'], {})
+
+        llm, embeddings, metrics, batcher = await self.adapter._get_or_build_metrics(cache_key, 'openai', config, ['relevance'], {})
+
+        assert embeddings is None
+        self.create_embeddings.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batcher_created_with_cached_metrics(self):
+        """Test that each cached metric configuration has its own batcher over its metrics"""
+        llm_config = self.adapter_config()
+        first = await self.get_metrics(self.adapter, llm_config, ['relevance'])
+        other = await self.get_metrics(self.adapter, llm_config, ['correctness'])
+
+        assert first[3].ragas_metrics is first[2]
+        assert first[3] is not other[3]
+
+    @pytest.mark.asyncio
+    async def test_evicted_metrics_close_their_batcher(self):
+        """Test that evicting a metric configuration closes its batcher"""
+        llm_config = self.adapter_config()
+        first = await self.get_metrics(self.adapter, llm_config, ['relevance'])
+
+        with patch.object(ragas_adapter_refactored, '_METRIC_CACHE_MAX_SIZE', 1), \
+             patch.object(RagasBatcher, 'close', autospec=True) as close:
+            await self.get_metrics(self.adapter, llm_config, ['correctness'])
+
+        assert len(ragas_adapter_refactored._metric_cache) == 1
+        close.assert_called_once_with(first[3])
+
+    def test_cache_key_does_not_contain_api_key(self):
+        """Test that the raw API key is not stored in the cache key"""
+        key = RagasAdapter._metric_cache_key('azure_openai', self.adapter_config(), ['relevance'], AZURE_PARAMS)
+        assert 'test-key' not in repr(key)
+
+    @staticmethod
+    async def get_metrics(adapter, llm_config, metrics):
+        """Get the configured metrics for an Azure OpenAI config"""
+        cache_key = RagasAdapter._metric_cache_key('azure_openai', llm_config, metrics, AZURE_PARAMS)
+        return await adapter._get_or_build_metrics(cache_key, 'azure_openai', llm_config, metrics, AZURE_PARAMS)
+
+    @staticmethod
+    def adapter_config():
+        """Build an Azure OpenAI LLM config"""
+        return {
+            'provider': 'azure_openai',
+            'api_base': AZURE_PARAMS['langfuse.azure_endpoint'],
+            'api_key': AZURE_PARAMS['langfuse.azure_api_key'],
+            'api_version': AZURE_PARAMS['langfuse.model_version'],
+            'deployment_name': AZURE_PARAMS['langfuse.azure_deployment'],
+            'model': 'gpt-4'
+        }
+
+
+class TestRagasBatcher:
+    """Test batching of concurrent RAGAS evaluations"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_rows_evaluated_in_one_batch(self):
+        """Test that concurrent submissions share one RAGAS run and get their own rows"""
+        batcher = RagasBatcher([Mock()], batch_size=8, max_wait_ms=20)
+        rows = [{'question': f'q{i}'} for i in range(3)]
+
+        with patch.object(RagasEvaluator, 'build_dataset', side_effect=lambda batch: batch), \
+             patch.object(RagasEvaluator, 'run_evaluation', new=AsyncMock(side_effect=lambda dataset, metrics: dataset)) as run, \
+             patch.object(RagasEvaluator, 'result_rows', side_effect=lambda result: [dict(r, score=0.9) for r in result]):
+            results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+
+        assert run.await_count == 1
+        assert [r['question'] for r in results] == ['q0', 'q1', 'q2']
+
+    @pytest.mark.asyncio
+    async def test_batch_size_limits_rows_per_run(self):
+        """Test that batches are split at batch_size"""
+        batcher = RagasBatcher([Mock()], batch_size=2, max_wait_ms=20)
+
+        with patch.object(RagasEvaluator, 'build_dataset', side_effect=lambda batch: batch), \
+             patch.object(RagasEvaluator, 'run_evaluation', new=AsyncMock(side_effect=lambda dataset, metrics: dataset)) as run, \
+             patch.object(RagasEvaluator, 'result_rows', side_effect=lambda result: result):
+            await asyncio.gather(*(batcher.submit({'question': f'q{i}'}) for i in range(3)))
+
+        assert run.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_propagates_to_callers(self):
+        """Test that a failed RAGAS run raises for every row in the batch"""
+        batcher = RagasBatcher([Mock()], batch_size=8, max_wait_ms=20)
+
+        with patch.object(RagasEvaluator, 'build_dataset', side_effect=lambda batch: batch), \
+             patch.object(RagasEvaluator, 'run_evaluation', new=AsyncMock(side_effect=RuntimeError("rate limited"))):
+            results = await asyncio.gather(
+                batcher.submit({'question': 'q0'}),
+                batcher.submit({'question': 'q1'}),
+                return_exceptions=True
+            )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_close_evaluates_queued_rows(self):
+        """Test that rows queued before close are still evaluated"""
+        batcher = RagasBatcher([Mock()], batch_size=8, max_wait_ms=10_000)
+
+        with self.patch_evaluation() as run:
+            pending = asyncio.create_task(batcher.submit({'question': 'q0'}))
+            await asyncio.sleep(0)
+            worker = batcher._worker
+
+            batcher.close()
+
+            assert await asyncio.wait_for(pending, 1) == {'question': 'q0', 'score': 0.9}
+            await asyncio.wait_for(worker, 1)
+        assert run.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_close_runs_partial_batch_without_waiting(self):
+        """Test that closing runs a batch that is still filling instead of waiting for more rows"""
+        batcher = RagasBatcher([Mock()], batch_size=8, max_wait_ms=10_000)
+
+        with self.patch_evaluation():
+            pending = asyncio.create_task(batcher.submit({'question': 'q0'}))
+            for _ in range(3):
+                await asyncio.sleep(0)
+
+            batcher.close()
+
+            assert await asyncio.wait_for(pending, 1) == {'question': 'q0', 'score': 0.9}
+
+    @pytest.mark.asyncio
+    async def test_close_from_another_thread(self):
+        """Test that a batcher can be closed from a thread other than its loop's"""
+        batcher = RagasBatcher([Mock()], batch_size=8, max_wait_ms=10_000)
+
+        with self.patch_evaluation():
+            pending = asyncio.create_task(batcher.submit({'question': 'q0'}))
+            await asyncio.sleep(0)
+
+            await asyncio.to_thread(batcher.close)
+
+            assert await asyncio.wait_for(pending, 1) == {'question': 'q0', 'score': 0.9}
+
+    @pytest.mark.asyncio
+    async def test_submit_after_close_is_rejected(self):
+        """Test that a closed batcher accepts no new rows"""
+        batcher = RagasBatcher([Mock()])
+        batcher.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            await batcher.submit({'question': 'q0'})
+
+    @pytest.mark.asyncio
+    async def test_worker_error_fails_waiting_rows(self):
+        """Test that rows held by a failing worker get its error instead of hanging"""
+        batcher = RagasBatcher([Mock()], batch_size=8)
+        batcher.max_wait = None  # Makes the worker fail while collecting a batch
+
+        results = await asyncio.wait_for(asyncio.gather(
+            batcher.submit({'question': 'q0'}),
+            batcher.submit({'question': 'q1'}),
+            return_exceptions=True
+        ), 1)
+
+        assert all(isinstance(result, TypeError) for result in results)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def patch_evaluation():
+        """Patch RAGAS evaluation to score every row 0.9"""
+        with patch.object(RagasEvaluator, 'build_dataset', side_effect=lambda batch: batch), \
+             patch.object(RagasEvaluator, 'run_evaluation', new=AsyncMock(side_effect=lambda dataset, metrics: dataset)) as run, \
+             patch.object(RagasEvaluator, 'result_rows', side_effect=lambda result: [dict(r, score=0.9) for r in result]):
+            yield run
+
+
+class TestRagasAdapterConcurrentEvaluations:
+    """Test concurrent evaluations sharing one metric configuration"""
+
+    def setup_method(self):
+        """Set up an adapter with mocked providers and RAGAS evaluation"""
+        ragas_adapter_refactored._metric_cache.clear()
+        ragas_adapter_refactored._probed_configs.clear()
+
+        async def slow_probe(llm, embeddings):
+            await asyncio.sleep(0.05)
+            return True, True
+
+        self.adapter = RagasAdapter()
+        self.adapter._llm_provider = Mock()
+        self.adapter.llm_provider.detect_provider.return_value = ('openai', {'api_key': 'test-key', 'model': 'gpt-4'})
+        self.adapter.azure_configurator = Mock()
+        self.adapter.azure_configurator.test_azure_connectivity = AsyncMock(side_effect=slow_probe)
+        self.patches = [
+            patch.object(RagasEvaluator, 'is_available', return_value=True),
+            patch.object(RagasEvaluator, 'wrap_llm', return_value=Mock()),
+            patch.object(RagasEvaluator, 'initialize_ragas_metrics', side_effect=lambda metrics, llm, embeddings: [Mock()]),
+            patch.object(RagasEvaluator, 'prepare_row', side_effect=lambda question, *args: {'question': question}),
+            patch.object(RagasEvaluator, 'build_dataset', side_effect=lambda batch: batch),
+            patch.object(RagasEvaluator, 'run_evaluation', new=AsyncMock(side_effect=lambda dataset, metrics: dataset)),
+            patch.object(RagasEvaluator, 'result_rows', side_effect=lambda result: [{'answer_relevancy': 0.9} for _ in result])
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        """Remove the patches and clear the shared metric cache"""
+        for p in self.patches:
+            p.stop()
+        ragas_adapter_refactored._metric_cache.clear()
+        ragas_adapter_refactored._probed_configs.clear()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_evaluations_do_not_fall_back(self):
+        """Test that staggered evaluations arriving during the first build all get RAGAS scores"""
+        async def evaluate(delay):
+            await asyncio.sleep(delay)
+            return await self.adapter.evaluate("Which planet is the largest?", "Jupiter", ['relevance'], {})
+
+        scores = await asyncio.wait_for(asyncio.gather(*(evaluate(i * 0.005) for i in range(20))), 5)
+
+        assert scores == [{'relevance': 0.9}] * 20
+        assert RagasEvaluator.initialize_ragas_metrics.call_count == 1
+
+
+class TestLLMProviderInstanceCache:
+    """Test reuse of LangChain LLM clients"""
+
+    def setup_method(self):
+        """Clear the shared LLM instance cache"""
+        llm_provider._instance_cache.clear()
+
+    def teardown_method(self):
+        """Clear the shared LLM instance cache"""
+        llm_provider._instance_cache.clear()
+
+    def test_instance_reused_for_same_config(self):
+        """Test that the same config returns the same client"""
+        provider = LLMProvider()
+        config = TestRagasAdapterMetricCache.adapter_config()
+
+        with patch.object(LLMProvider, '_create_instance', side_effect=lambda provider_type, llm_config: Mock()) as create:
+            first = provider.create_instance('azure_openai', config)
+            second = LLMProvider().create_instance('azure_openai', dict(config))
+            rotated = provider.create_instance('azure_openai', dict(config, api_key='rotated-key'))
+
+        assert first is second
+        assert first is not rotated
+        assert create.call_count == 2
+
+    def test_unsupported_provider(self):
+        """Test that unknown provider types are rejected"""
+        with pytest.raises(ValueError):
+            LLMProvider().create_instance('unknown', {'model': 'x'})
+
+
+class TestUVLoopHandler:
+    """Test event loop detection and the shared background loop"""
+
+    @pytest.mark.asyncio
+    async def test_detect_uvloop_on_asyncio_loop(self):
+        """Test that a standard asyncio loop is not reported as uvloop"""
+        assert UVLoopHandler.detect_uvloop() is False
+
+    def test_detect_uvloop_on_uvloop(self):
+        """Test that a uvloop loop is detected"""
+        uvloop = pytest.importorskip("uvloop")
+
+        async def detect():
+            return UVLoopHandler.detect_uvloop()
+
+        assert uvloop.run(detect()) is True
+
+    @pytest.mark.asyncio
+    async def test_background_loop_is_reused(self):
+        """Test that coroutines run on one shared loop in another thread"""
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = await UVLoopHandler.run_in_background_loop(current_loop())
+        second = await UVLoopHandler.run_in_background_loop(current_loop())
+
+        assert first is second
+        assert first is not asyncio.get_running_loop()
+
+
+class TestAzureConnectivity:
+    """Test LLM and embeddings connectivity probes"""
+
+    @pytest.mark.asyncio
+    async def test_probes_succeed(self):
+        """Test that both probes report success"""
+        llm = Mock()
+        llm.agenerate = AsyncMock(return_value=Mock(generations=[[Mock()]]))
+        embeddings = Mock()
+        embeddings.embeddings.embed_query.return_value = [0.1, 0.2]
+
+        result = await AzureOpenAIConfigurator.test_azure_connectivity(llm, embeddings)
+
+        assert result == (True, True)
+        embeddings.embeddings.embed_query.assert_called_once_with("test")
+
+    @pytest.mark.asyncio
+    async def test_probe_failures_are_independent(self):
+        """Test that a failing LLM probe doesn't affect the embeddings probe"""
+        llm = Mock()
+        llm.agenerate = AsyncMock(side_effect=RuntimeError("unreachable"))
+        embeddings = Mock()
+        embeddings.embeddings.embed_query.return_value = [0.1]
+
+        assert await AzureOpenAIConfigurator.test_azure_connectivity(llm, embeddings) == (False, True)
+
+    @pytest.mark.asyncio
+    async def test_no_embeddings(self):
+        """Test that only the LLM is probed without embeddings"""
+        llm = Mock()
+        llm.agenerate = AsyncMock(return_value=Mock(generations=[[Mock()]]))
+
+        assert await AzureOpenAIConfigurator.test_azure_connectivity(llm, None) == (True, False)
+
+
+class TestRagasAdapterWithoutRagas:
+    """Test the adapter when RAGAS is not installed"""
+
+    @pytest.mark.asyncio
+    async def test_fallback_without_llm_provider(self):
+        """Test that fallback scores are returned without creating an LLM provider"""
+        adapter = RagasAdapter()
+
+        with patch.object(RagasEvaluator, 'is_available', return_value=False), \
+             patch.object(RagasAdapter, '_run_evaluation') as run_evaluation:
+            scores = await adapter.evaluate("What is Python?", "Python is a language", ['relevance'], AZURE_PARAMS)
+
+        assert scores == {'relevance': 2 / 3}
+        assert adapter._llm_provider is None
+        run_evaluation.assert_not_called()
+
+
+class TestRagasAdapterOnUVLoop:
+    """Test the adapter on the uvloop loop the service runs on"""
+
+    def setup_method(self):
+        """Reset the cached RAGAS availability"""
+        ragas_evaluator._ragas_available.cache_clear()
+
+    def teardown_method(self):
+        """Reset the cached RAGAS availability"""
+        ragas_evaluator._ragas_available.cache_clear()
+
+    def test_ragas_not_imported_on_uvloop(self):
+        """Test that RAGAS is first imported on the background loop, not on uvloop"""
+        uvloop = pytest.importorskip("uvloop")
+        import_loops = []
+
+        def import_ragas():
+            # Importing RAGAS applies nest_asyncio, which can't patch uvloop
+            loop = asyncio.get_running_loop()
+            import_loops.append(loop)
+            if isinstance(loop, uvloop.Loop):
+                raise ValueError(f"Can't patch loop of type {type(loop)}")
+            raise ImportError("ragas is broken")
+
+        adapter = RagasAdapter()
+        adapter._llm_provider = Mock()
+        adapter.llm_provider.detect_provider.return_value = ('openai', {'api_key': 'test-key', 'model': 'gpt-4'})
+
+        with patch('importlib.util.find_spec', return_value=Mock()), \
+             patch.object(ragas_evaluator, '_ragas_symbols', side_effect=import_ragas):
+            scores = uvloop.run(adapter.evaluate("What is Python?", "Python is a language", ['relevance'], {}))
+
+        assert scores == {'relevance': 2 / 3}
+        assert import_loops
+        assert not any(isinstance(loop, uvloop.Loop) for loop in import_loops)
@@ -0,0 +1,281 @@
+"""Test suite for the RAGAS evaluator"""
+
+import asyncio
+import math
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from src.evaluator.oss_providers import ragas_evaluator
+from src.evaluator.oss_providers.ragas_evaluator import RagasEvaluator
+
+
+class TestExtractScores:
+    """Test mapping of RAGAS result rows back to requested metrics"""
+
+    def test_direct_and_proxy_metrics(self):
+        """Test that metrics and their proxies read the mapped RAGAS columns"""
+        result_row = {'answer_relevancy': 0.8, 'answer_similarity': 0.6, 'faithfulness': 0.9}
+
+        scores = RagasEvaluator.extract_scores(
+            result_row, ['relevance', 'helpfulness', 'similarity', 'clarity', 'faithfulness']
+        )
+
+        assert scores == {
+            'relevance': 0.8,
+            'helpfulness': 0.8,
+            'similarity': 0.6,
+            'clarity': 0.6,
+            'faithfulness': 0.9
+        }
+
+    def test_nan_score_uses_nan_fallback(self):
+        """Test that NaN results are replaced with the NaN fallback score"""
+        scores = RagasEvaluator.extract_scores({'answer_correctness': math.nan}, ['correctness'])
+        assert scores == {'correctness': 0.7}
+
+    def test_missing_and_unsupported_metrics_use_default(self):
+        """Test that missing or unmapped metrics get the default score"""
+        scores = RagasEvaluator.extract_scores({'answer_relevancy': 0.8}, ['correctness', 'toxicity', 'unknown'])
+        assert scores == {'correctness': 0.5, 'toxicity': 0.5, 'unknown': 0.5}
+
+    def test_non_float_values_are_converted(self):
+        """Test that integer results are returned as floats"""
+        scores = RagasEvaluator.extract_scores({'answer_relevancy': 1}, ['relevance'])
+        assert scores == {'relevance': 1.0}
+        assert isinstance(scores['relevance'], float)
+
+
+class TestResultRows:
+    """Test conversion of RAGAS results into per-row dictionaries"""
+
+    def test_uses_scores_without_pandas(self):
+        """Test that per-row scores are read directly from the result"""
+        result = Mock()
+        result.scores = [{'answer_relevancy': 0.8}, {'answer_relevancy': 0.4}]
+
+        assert RagasEvaluator.result_rows(result) == [{'answer_relevancy': 0.8}, {'answer_relevancy': 0.4}]
+        result.to_pandas.assert_not_called()
+
+    def test_falls_back_to_pandas(self):
+        """Test that results without scores are converted through pandas"""
+        result = Mock(spec=['to_pandas'])
+        result.to_pandas.return_value.to_dict.return_value = [{'answer_relevancy': 0.8}]
+
+        assert RagasEvaluator.result_rows(result) == [{'answer_relevancy': 0.8}]
+        result.to_pandas.return_value.to_dict.assert_called_once_with('records')
+
+
+class TestFallbackScores:
+    """Test heuristic scores used when RAGAS is unavailable"""
+
+    def test_relevance_ignores_punctuation(self):
+        """Test that word overlap is computed on words without punctuation"""
+        scores = RagasEvaluator.get_fallback_scores("What is Python?", "Python is a language.", ['relevance'])
+        assert scores['relevance'] == 2 / 3
+
+    def test_relevance_keeps_contractions_and_non_ascii_words(self):
+        """Test that apostrophes stay inside tokens and non-ASCII words are matched"""
+        scores = RagasEvaluator.get_fallback_scores("What's déjà vu?", "Déjà vu is what's described.", ['relevance'])
+        assert scores['relevance'] == 1.0
+
+    def test_input_tokens_cached_across_outputs(self):
+        """Test that an input evaluated against several outputs is tokenized once"""
+        ragas_evaluator._input_tokens.cache_clear()
+        question = "Which planet is the largest?"
+
+        first = RagasEvaluator.get_fallback_scores(question, "Jupiter is the largest planet", ['relevance'])
+        second = RagasEvaluator.get_fallback_scores(question, "Saturn is large", ['relevance'])
+
+        assert first['relevance'] == 0.8
+        assert second['relevance'] == 0.2
+        assert ragas_evaluator._input_tokens.cache_info().hits == 1
+
+    def test_toxicity_counts_distinct_whole_words(self):
+        """Test that toxicity counts each toxic word once and only as a whole word"""
+        scores = RagasEvaluator.get_fallback_scores("q", "I HATE this, hate it, worst ever", ['toxicity'])
+        assert scores['toxicity'] == 2 / 3
+
+        scores = RagasEvaluator.get_fallback_scores("q", "She studied the skill", ['toxicity'])
+        assert scores['toxicity'] == 0.0
+
+    def test_toxicity_is_capped(self):
+        """Test that the toxicity score does not exceed 1.0"""
+        scores = RagasEvaluator.get_fallback_scores("q", "hate stupid idiot kill worst", ['toxicity'])
+        assert scores['toxicity'] == 1.0
+
+
+class TestBuildDataset:
+    """Test construction of RAGAS datasets from prepared rows"""
+
+    def test_uses_ragas_evaluation_dataset(self):
+        """Test that rows are converted to RAGAS single-turn samples"""
+        evaluation_dataset, single_turn_sample = MagicMock(), Mock(side_effect=lambda **fields: fields)
+        dataset_class = MagicMock()
+
+        with patch.object(ragas_evaluator, '_evaluation_dataset_classes', return_value=(evaluation_dataset, single_turn_sample)), \
+             patch.object(ragas_evaluator, '_dataset_class', return_value=dataset_class):
+            row = RagasEvaluator.prepare_row("What is 2+2?", "4", "math facts")
+            RagasEvaluator.build_dataset([row])
+
+        evaluation_dataset.assert_called_once_with(samples=[{
+            'user_input': "What is 2+2?",
+            'response': "4",
+            'retrieved_contexts': ["math facts"],
+            'reference': "4"
+        }])
+        dataset_class.from_list.assert_not_called()
+
+    def test_falls_back_to_huggingface_dataset(self):
+        """Test that rows go through Dataset.from_list without the RAGAS schema"""
+        dataset_class = MagicMock()
+
+        with patch.object(ragas_evaluator, '_evaluation_dataset_classes', return_value=None), \
+             patch.object(ragas_evaluator, '_dataset_class', return_value=dataset_class):
+            rows = [RagasEvaluator.prepare_row("What is 2+2?", "4")]
+            RagasEvaluator.build_dataset(rows)
+
+        dataset_class.from_list.assert_called_once_with(rows)
+
+
+class TestPrepareRow:
+    """Test dataset row preparation"""
+
+    def test_current_ragas_field_names(self):
+        """Test that only current field names are used when the RAGAS schema is available"""
+        with patch.object(ragas_evaluator, '_evaluation_dataset_classes', return_value=(Mock(), Mock())):
+            row = RagasEvaluator.prepare_row("What is 2+2?", "4", "math facts")
+
+        assert row == {
+            'user_input': "What is 2+2?",
+            'response': "4",
+            'retrieved_contexts': ["math facts"],
+            'reference': "4"
+        }
+
+    def test_legacy_ragas_field_names(self):
+        """Test that only legacy field names are used without the RAGAS schema"""
+        with patch.object(ragas_evaluator, '_evaluation_dataset_classes', return_value=None):
+            row = RagasEvaluator.prepare_row("What is 2+2?", "4")
+
+        assert row == {
+            'question': "What is 2+2?",
+            'answer': "4",
+            'contexts': ["No specific context provided"],
+            'ground_truth': "4"
+        }
+
+
+class FakeMetric:
+    """Stand-in for a RAGAS metric that uses an LLM and embeddings"""
+
+    name = 'fake_metric'
+
+    def __init__(self):
+        self.llm = None
+        self.embeddings = None
+        self.run_config = None
+
+    def init(self, run_config):
+        self.run_config = run_config
+
+
+class TestInitializeRagasMetrics:
+    """Test configuration of RAGAS metric instances"""
+
+    def setup_method(self):
+        """Patch the RAGAS symbols with fake metrics"""
+        self.shared_metric = FakeMetric()
+        symbols = SimpleNamespace(
+            MetricWithLLM=FakeMetric,
+            MetricWithEmbeddings=FakeMetric,
+            RunConfig=Mock,
+            answer_relevancy=self.shared_metric
+        )
+        self.patches = [
+            patch.object(ragas_evaluator, '_ragas_symbols', return_value=symbols),
+            patch.object(ragas_evaluator, '_ragas_metric_map', return_value={'relevance': self.shared_metric})
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        """Remove the RAGAS symbol patches"""
+        for p in self.patches:
+            p.stop()
+
+    def test_metrics_are_configured_copies(self):
+        """Test that configured metrics are copies of the shared RAGAS instances"""
+        llm, embeddings = Mock(), Mock()
+
+        metrics = RagasEvaluator.initialize_ragas_metrics(['relevance', 'toxicity'], llm, embeddings)
+
+        assert len(metrics) == 1
+        assert metrics[0] is not self.shared_metric
+        assert metrics[0].llm is llm
+        assert metrics[0].embeddings is embeddings
+        assert metrics[0].run_config is not None
+        assert self.shared_metric.llm is None
+
+    def test_default_metric_when_none_supported(self):
+        """Test that answer_relevancy is used when no requested metric is supported"""
+        llm = Mock()
+
+        metrics = RagasEvaluator.initialize_ragas_metrics(['toxicity'], llm)
+
+        assert len(metrics) == 1
+        assert metrics[0].llm is llm
+        assert self.shared_metric.llm is None
+
+    def test_metric_mappings_are_read_only(self):
+        """Test that the shared metric mappings cannot be modified"""
+        with pytest.raises(TypeError):
+            RagasEvaluator.METRIC_MAPPINGS['relevance'] = 'other'
+
+
+class TestRunEvaluation:
+    """Test execution of RAGAS evaluations"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_are_capped(self):
+        """Test that no more than RAGAS_MAX_CONCURRENT RAGAS runs are in flight"""
+        in_flight, peak = 0, 0
+
+        async def aevaluate(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 'result'
+
+        symbols = SimpleNamespace(aevaluate=aevaluate, RunConfig=lambda **kwargs: kwargs)
+
+        with patch.object(ragas_evaluator, '_ragas_symbols', return_value=symbols), \
+             patch.object(ragas_evaluator, 'RAGAS_MAX_CONCURRENT', 2), \
+             patch.dict(ragas_evaluator._evaluation_semaphores, clear=True):
+            results = await asyncio.gather(*(RagasEvaluator.run_evaluation('dataset', ['metric']) for _ in range(6)))
+
+        assert results == ['result'] * 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_awaits_async_evaluate(self):
+        """Test that RAGAS's aevaluate is awaited with the configured run config"""
+        symbols = SimpleNamespace(aevaluate=AsyncMock(return_value='result'), RunConfig=lambda **kwargs: kwargs)
+
+        with patch.object(ragas_evaluator, '_ragas_symbols', return_value=symbols):
+            result = await RagasEvaluator.run_evaluation('dataset', ['metric'])
+
+        assert result == 'result'
+        symbols.aevaluate.assert_awaited_once()
+        assert symbols.aevaluate.call_args.kwargs['run_config']['max_workers'] == ragas_evaluator.RAGAS_MAX_WORKERS
+
+    @pytest.mark.asyncio
+    async def test_semaphore_shared_per_loop(self):
+        """Test that evaluations on one loop share a bounded semaphore"""
+        semaphore = ragas_evaluator._evaluation_semaphore()
+
+        assert semaphore is ragas_evaluator._evaluation_semaphore()
+        assert semaphore._value == ragas_evaluator.RAGAS_MAX_CONCURRENT